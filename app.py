@@ -1,6 +1,8 @@
+import os
+
+import numpy as np
 import pandas as pd
 import streamlit as st
-from urllib.parse import quote_plus
 
 # ----------------------------
 # Page config
@@ -14,8 +16,11 @@ st.set_page_config(
 # ----------------------------
 # Styling (table + UI)
 # ----------------------------
-st.markdown(
-    """
+# Kept as a module-level constant: the literal is compiled once and every
+# rerun reuses the same string object. It is still emitted per rerun
+# because Streamlit drops elements a rerun does not re-emit, which would
+# strip the styling on the first widget interaction.
+CSS = """
     <style>
       /* Make the page breathe */
       .block-container { padding-top: 2rem; padding-bottom: 2rem; }
@@ -102,18 +107,67 @@ table th:nth-child(6) {
     text-align: center !important;
 }
     </style>
-    """,
-    unsafe_allow_html=True,
-)
+    """
+
+st.markdown(CSS, unsafe_allow_html=True)
 
 # ----------------------------
 # Data loading
 # ----------------------------
-@st.cache_data
+# season/team are low-cardinality, so category dtype turns the season
+# filter into an integer-code compare; the count columns fit comfortably
+# in int16. Declaring this at read time means the wide int64/object
+# columns are never materialized.
+CSV_DTYPES = {
+    "season": "category",
+    "team": "category",
+    "matches_played": "int16",
+    "wins": "int16",
+    "losses": "int16",
+    "no_result": "int16",
+    "points": "int16",
+    "win_pct": "float32",
+}
+
+REQUIRED_COLUMNS = frozenset(CSV_DTYPES)
+
+def _check_columns(df: pd.DataFrame) -> pd.DataFrame:
+    missing = REQUIRED_COLUMNS.difference(df.columns)
+    if missing:
+        raise ValueError(f"Missing columns in your CSV for this app: {sorted(missing)}")
+    return df
+
+@st.cache_data(persist="disk", show_spinner=False, max_entries=4)
 def load_points_table(path: str) -> pd.DataFrame:
-    df = pd.read_csv(path)
+    # Prefer a Parquet sidecar written on first load: it skips CSV
+    # tokenization and type inference on every cold start after the first.
+    cache = path + ".parquet"
+    if os.path.exists(cache) and os.path.getmtime(cache) >= os.path.getmtime(path):
+        return _check_columns(pd.read_parquet(cache, engine="pyarrow"))
+
+    # Headers may be whitespace-padded; the dtype map is keyed by the
+    # clean names, so re-key it by whatever the file actually calls them.
+    raw_cols = pd.read_csv(path, nrows=0).columns
+    dtypes = {c: CSV_DTYPES[c.strip()] for c in raw_cols if c.strip() in CSV_DTYPES}
+    try:
+        # The Arrow reader tokenizes in parallel; worth it as the table grows.
+        df = pd.read_csv(path, dtype=dtypes, engine="pyarrow")
+    except ImportError:
+        df = pd.read_csv(path, dtype=dtypes)
     # Clean column names if needed
     df.columns = [c.strip() for c in df.columns]
+    _check_columns(df)
+    # Latest season first, stored in the categorical itself: the selectbox
+    # list becomes a precomputed retrieval instead of a per-rerun sort.
+    df["season"] = df["season"].cat.reorder_categories(
+        sorted(df["season"].cat.categories, reverse=True), ordered=True
+    )
+    try:
+        df.to_parquet(cache, engine="pyarrow", compression="zstd")
+    except Exception:
+        # The sidecar is a best-effort accelerator; the CSV stays the
+        # source of truth if pyarrow is missing or the folder is read-only.
+        pass
     return df
 
 # Change this if your file name differs
@@ -132,121 +186,126 @@ st.markdown('<div class="title-wrap"><h1>🏏 IPL Points Table</h1></div>', unsa
 st.markdown('<div class="subtitle">Pick a season. Click a team name to open a Google search in a new tab.</div>', unsafe_allow_html=True)
 
 # ----------------------------
-# Season selector
+# Per-season view (cached)
 # ----------------------------
-if "season" not in df_all.columns:
-    st.error("Your CSV must have a 'season' column.")
-    st.stop()
+# Team names only contain ASCII letters and spaces, so URL escaping
+# reduces to mapping spaces to '+'; a translate table does that in one
+# C call per string instead of the full quote_plus machinery.
+SEARCH_BASE = "https://www.google.com/search?q="
+SEARCH_SUFFIX = "+IPL+team"
+TEAM_TT = str.maketrans({" ": "+"})
 
-seasons = list(pd.Series(df_all["season"].dropna().unique()).sort_values())
-season = st.selectbox("Season", seasons, index=len(seasons) - 1)
+def google_search_url(team: str) -> str:
+    return f"{SEARCH_BASE}{team.translate(TEAM_TT)}{SEARCH_SUFFIX}"
 
-df_season = df_all[df_all["season"] == season].copy()
+def _prep_season(df_season: pd.DataFrame, url_map: dict) -> pd.DataFrame:
+    """Rank and link one season's rows.
+
+    The CSV rows are already in official-standings order, with ties
+    broken by net run rate (which this table does not carry), so the rows
+    are kept as-is and ranked by position - re-sorting on points/win_pct
+    alone would misplace NRR-tied teams.
+    """
+    # reset_index yields an independent frame, so mutating the result
+    # below never touches the parent - no up-front copy needed.
+    df_season = df_season.reset_index(drop=True)
+    df_season["rank"] = np.arange(1, len(df_season) + 1, dtype=np.int16)
+
+    # .map on the categorical column resolves codes through the hash
+    # table; the result keeps category dtype, so cast to str before the
+    # string concatenation below.
+    urls = df_season["team"].map(url_map).astype(str)
+    teams = df_season["team"].astype(str)
+    df_season["team_link"] = (
+        '<a class="team-link" href="' + urls
+        + '" target="_blank" rel="noopener noreferrer">' + teams + "</a>"
+    )
+    return df_season
+
+@st.cache_resource
+def season_views(df: pd.DataFrame) -> dict:
+    """Prepare every season once; switching seasons is then a dict lookup."""
+    # ~15 distinct teams across all seasons: build their URLs exactly once.
+    url_map = {t: google_search_url(t) for t in df["team"].cat.categories}
+    return {
+        s: _prep_season(sub, url_map)
+        for s, sub in df.groupby("season", sort=False, observed=True)
+    }
 
 # ----------------------------
-# Basic validation for expected columns
+# Table HTML (cached per season)
 # ----------------------------
-required = {"team", "matches_played", "wins", "losses", "no_result", "points", "win_pct"}
-missing = required - set(df_season.columns)
-if missing:
-    st.error(f"Missing columns in your CSV for this app: {sorted(list(missing))}")
-    st.stop()
 
-# Ensure a clean rank based on current ordering (or sort if you prefer)
-# If your CSV is already correctly sorted, keep as-is.
-# Otherwise you can uncomment sorting below:
-# df_season = df_season.sort_values(["points", "win_pct"], ascending=[False, False]).reset_index(drop=True)
-
-df_season = df_season.reset_index(drop=True)
-df_season["rank"] = df_season.index + 1
-
-# KPIs
-teams_count = df_season["team"].nunique()
-max_points = int(df_season["points"].max())
-top_win = float(df_season["win_pct"].max())
-top_win_str = f"{top_win:.1f}"
-
-st.markdown(
-    f"""
-    <div class="kpi-row">
-      <div class="kpi">
-        <div class="kpi-label">Teams</div>
-        <div class="kpi-value">{teams_count}</div>
-      </div>
-      <div class="kpi">
-        <div class="kpi-label">Max Points</div>
-        <div class="kpi-value">{max_points}</div>
-      </div>
-      <div class="kpi">
-        <div class="kpi-label">Top Win %</div>
-        <div class="kpi-value">{top_win_str}</div>
-      </div>
-    </div>
-    """,
-    unsafe_allow_html=True,
+# The column set is fixed, so the header is written once by hand and each
+# row is a single f-string with its alignment classes already in place -
+# no to_html introspection and no post-processing pass over the result.
+TABLE_HEAD = (
+    "<thead><tr>"
+    '<th class="col-rank">Rank</th>'
+    '<th class="col-team">Team</th>'
+    "<th>P</th><th>W</th><th>L</th>"
+    '<th class="col-pts">Pts</th>'
+    "<th>Win %</th>"
+    "</tr></thead>"
 )
 
+@st.cache_data
+def season_table_html(season) -> str:
+    """Render one season's table to HTML once; reruns reuse the string."""
+    df_season = season_views(df_all)[season]
+    cols = ["rank", "team_link", "matches_played", "wins", "losses", "points", "win_pct"]
+    rows = [
+        f'<tr><td class="col-rank">{rank}</td>'
+        f"<td>{team_link}</td>"
+        f'<td class="num">{p}</td><td class="num">{w}</td><td class="num">{l}</td>'
+        f'<td class="col-pts">{pts}</td>'
+        f'<td class="num">{wp:.1f}</td></tr>'
+        for rank, team_link, p, w, l, pts, wp in df_season[cols].itertuples(index=False, name=None)
+    ]
+    return "<table>" + TABLE_HEAD + "<tbody>" + "\n".join(rows) + "</tbody></table>"
+
 # ----------------------------
-# Build clickable Team (NO extra column)
+# Season selector + KPIs + table
 # ----------------------------
-def team_anchor(team: str) -> str:
-    q = quote_plus(f"{team} IPL team")
-    url = f"https://www.google.com/search?q={q}"
-    return f'<a class="team-link" href="{url}" target="_blank" rel="noopener noreferrer">{team}</a>'
-
-df_display = pd.DataFrame({
-    "Rank": df_season["rank"],
-    "Team": df_season["team"].astype(str).apply(team_anchor),
-    "P": df_season["matches_played"],
-    "W": df_season["wins"],
-    "L": df_season["losses"],
-    "Pts": df_season["points"],
-    "Win %": df_season["win_pct"].round(1),
-})
-
-# Convert to HTML and inject per-column classes for alignment control
-html_table = df_display.to_html(index=False, escape=False)
-
-# Add classes to Rank and Pts columns (both header + cells)
-# This is a simple string replace approach for stable column order.
-html_table = html_table.replace("<th>Rank</th>", '<th class="col-rank">Rank</th>')
-html_table = html_table.replace("<th>Team</th>", '<th class="col-team">Team</th>')
-html_table = html_table.replace("<th>Pts</th>", '<th class="col-pts">Pts</th>')
-
-# Add classes to first column (Rank) and Pts column by targeting <td> positions
-# Rank is col 1, Pts is col 7 in our df_display
-def add_td_classes(table_html: str) -> str:
-    out = []
-    in_row = False
-    td_index = 0
-    for part in table_html.split("<td"):
-        if not in_row:
-            # before the first <td of the document
-            out.append(part)
-            in_row = True
-            continue
-        # Each split chunk starts at after "<td"
-        # We need to know which td number we are in within a row. Reset after </tr>.
-        chunk = "<td" + part
-        # Reset on new row boundary
-        if "</tr>" in out[-1]:
-            td_index = 0
-
-        td_index += 1
-        if td_index == 1:
-            chunk = chunk.replace("<td>", '<td class="col-rank">', 1)
-        elif td_index == 6:
-            chunk = chunk.replace("<td>", '<td class="col-pts">', 1)
-        else:
-            # numeric columns (P,W,L,NR,Win%) right align for readability
-            # Team stays default because it's a link
-            if td_index in (3,4,5,7):
-                chunk = chunk.replace("<td>", '<td class="num">', 1)
-
-        out.append(chunk)
-    return "".join(out)
-
-html_table = add_td_classes(html_table)
-
-st.markdown(f"<h2>Points Table for {season}</h2>", unsafe_allow_html=True)
-st.markdown(f'<div class="table-wrap">{html_table}</div>', unsafe_allow_html=True)
+@st.fragment
+def render_season() -> None:
+    """Selector, KPI row and table; a season change reruns only this block."""
+    # Categories are already sorted latest-first at load time.
+    seasons = df_all["season"].cat.categories.tolist()
+    season = st.selectbox("Season", seasons, index=0)
+
+    df_season = season_views(df_all)[season]
+
+    # KPIs - reduce over the raw arrays so each metric is one C-level pass
+    # instead of going through pandas' generic reduction dispatch.
+    teams_count = df_season["team"].nunique()
+    max_points = int(df_season["points"].to_numpy().max())
+    top_win = float(df_season["win_pct"].to_numpy().max())
+    top_win_str = f"{top_win:.1f}"
+
+    st.markdown(
+        f"""
+        <div class="kpi-row">
+          <div class="kpi">
+            <div class="kpi-label">Teams</div>
+            <div class="kpi-value">{teams_count}</div>
+          </div>
+          <div class="kpi">
+            <div class="kpi-label">Max Points</div>
+            <div class="kpi-value">{max_points}</div>
+          </div>
+          <div class="kpi">
+            <div class="kpi-label">Top Win %</div>
+            <div class="kpi-value">{top_win_str}</div>
+          </div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    html_table = season_table_html(season)
+
+    st.markdown(f"<h2>Points Table for {season}</h2>", unsafe_allow_html=True)
+    st.markdown(f'<div class="table-wrap">{html_table}</div>', unsafe_allow_html=True)
+
+render_season()